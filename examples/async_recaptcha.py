@@ -0,0 +1,45 @@
+import sys
+import os
+import asyncio
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from twocaptcha import AsyncTwoCaptcha
+
+# in this example we store the API key inside environment variables that can be set like:
+# export APIKEY_2CAPTCHA=1abc234de56fab7c89012d34e56fa7b8 on Linux or macOS
+# set APIKEY_2CAPTCHA=1abc234de56fab7c89012d34e56fa7b8 on Windows
+# you can just set the API key directly to it's value like:
+# api_key="1abc234de56fab7c89012d34e56fa7b8"
+
+api_key = os.getenv('APIKEY_2CAPTCHA', 'YOUR_API_KEY')
+
+
+async def main():
+
+    solver = AsyncTwoCaptcha(api_key)
+
+    # both captchas are solved at the same time on one event loop
+    try:
+        return await asyncio.gather(
+            solver.recaptcha(
+                sitekey='6LdO5_IbAAAAAAeVBL9TClS19NUTt5wswEb3Q7C5',
+                url='https://2captcha.com/demo/recaptcha-v2-invisible'),
+            solver.recaptcha(
+                sitekey='6LfdxboZAAAAAMtnONIt4DJ8J1t4wMC-kVG02zIO',
+                url='https://2captcha.com/demo/recaptcha-v3',
+                version='v3'),
+        )
+
+    finally:
+        await solver.close()
+
+
+try:
+    results = asyncio.run(main())
+
+except Exception as e:
+    sys.exit(e)
+
+else:
+    sys.exit('result: ' + str(results))
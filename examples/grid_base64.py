@@ -17,7 +17,7 @@ api_key = os.getenv('APIKEY_2CAPTCHA', 'YOUR_API_KEY')
 solver = TwoCaptcha(api_key)
 
 with open('./images/grid_2.jpg', 'rb') as f:
-    b64 = b64encode(f.read()).decode('utf-8')
+    b64 = b64encode(f.read()).decode('ascii')
 
 try:
     result = solver.grid(b64,
@@ -0,0 +1,42 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from prometheus_client import Counter, Histogram, start_http_server
+from twocaptcha import TwoCaptcha
+
+# in this example we store the API key inside environment variables that can be set like:
+# export APIKEY_2CAPTCHA=1abc234de56fab7c89012d34e56fa7b8 on Linux or macOS
+# set APIKEY_2CAPTCHA=1abc234de56fab7c89012d34e56fa7b8 on Windows
+# you can just set the API key directly to it's value like:
+# api_key="1abc234de56fab7c89012d34e56fa7b8"
+
+api_key = os.getenv('APIKEY_2CAPTCHA', 'YOUR_API_KEY')
+
+# requires prometheus_client: pip3 install prometheus-client
+requests_total = Counter('twocaptcha_requests_total', 'Requests sent to the API', ['endpoint'])
+request_seconds = Histogram('twocaptcha_request_seconds', 'API request latency', ['endpoint'])
+response_bytes = Histogram('twocaptcha_response_bytes', 'API response size', ['endpoint'],
+                           buckets=(16, 64, 256, 1024, 4096, 16384))
+
+
+def metrics_hook(endpoint, seconds, size):
+    requests_total.labels(endpoint).inc()
+    request_seconds.labels(endpoint).observe(seconds)
+    response_bytes.labels(endpoint).observe(size)
+
+
+start_http_server(8000)
+
+solver = TwoCaptcha(api_key)
+solver.api_client.metrics_hook = metrics_hook
+
+try:
+    result = solver.normal('./images/normal.jpg')
+
+except Exception as e:
+    sys.exit(e)
+
+else:
+    sys.exit('result: ' + str(result))
@@ -19,6 +19,14 @@ setup(name='2captcha-python',
       long_description_content_type="text/markdown",
       url='https://github.com/2captcha/2captcha-python/',
       install_requires=['requests'],
+      extras_require={
+          'streaming': ['requests-toolbelt'],
+          'async': ['httpx[http2]'],
+          'http2': ['httpx[http2]'],
+          'images': ['Pillow'],
+          'curl': ['pycurl'],
+          'fast': ['pybase64'],
+      },
       author='2Captcha',
       author_email='info@2captcha.com',
       packages=find_packages(),
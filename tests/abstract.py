@@ -23,6 +23,38 @@ class ApiClient():
 
         return 'OK|' + code  # {'code': code}
 
+    def is_cached(self, **kwargs):
+
+        return False
+
+
+class Response():
+    '''streamed response of requests.Session.get, content may be a list of
+    chunks'''
+
+    def __init__(self, content, status_code=200):
+
+        self.chunks = content if isinstance(content, list) else [content]
+        self.content = b''.join(self.chunks)
+        self.status_code = status_code
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+
+        return iter(self.chunks)
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, *args):
+
+        self.close()
+
+    def close(self):
+
+        self.closed = True
+
 
 class AbstractTest(unittest.TestCase):
     def setUp(self):
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+
+import unittest
+import sys
+import os
+import io
+import requests
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from twocaptcha import ApiClient, Answer, TwoCaptcha
+from twocaptcha.api import httpx, pycurl, Image, ApiException, _retry, DEFAULT_HEADERS
+
+try:
+    from .abstract import Response
+except ImportError:
+    from abstract import Response
+
+images = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))),
+                      'examples', 'images')
+
+file = os.path.join(images, 'normal.jpg')
+large_file = os.path.join(images, 'canvas.jpg')
+
+
+class Session():
+    def __init__(self, content):
+
+        self.content = content
+
+    def get(self, url, **kwargs):
+
+        self.url = url
+        self.kwargs = kwargs
+
+        return Response(self.content.encode('utf-8'))
+
+    post = get
+
+    def close(self):
+        pass
+
+
+
+class ApiClientTest(unittest.TestCase):
+
+    def client(self, content):
+
+        api_client = ApiClient()
+        api_client._session = Session(content)
+
+        return api_client
+
+
+
+    def test_in_file(self):
+
+        api_client = self.client('OK|123')
+        resp = api_client.in_(file=file, method='post', key='API_KEY')
+
+        self.assertEqual(resp, 'OK|123')
+
+        kwargs = api_client._session.kwargs
+        files = kwargs.get('files') or kwargs['data'].fields
+
+        self.assertEqual(files['file'][0], 'normal.jpg')
+        self.assertTrue(files['file'][1].closed)
+
+
+
+    def test_in_files(self):
+
+        api_client = self.client('OK|123')
+        api_client.in_(files={'file_1': file, 'file_2': file},
+                       method='rotatecaptcha')
+
+        kwargs = api_client._session.kwargs
+        files = kwargs.get('files') or kwargs['data'].fields
+
+        self.assertEqual(files['file_1'][0], 'normal.jpg')
+        self.assertEqual(files['file_2'][0], 'normal.jpg')
+        self.assertTrue(files['file_2'][1].closed)
+
+
+
+    def test_in_bytes(self):
+
+        api_client = self.client('OK|123')
+        api_client.cache_ttl = 60
+
+        api_client.in_(file=('captcha.jpg', b'image'), method='post')
+
+        kwargs = api_client._session.kwargs
+        files = kwargs.get('files') or kwargs['data'].fields
+
+        self.assertEqual(files['file'][0], 'captcha.jpg')
+        self.assertIsInstance(files['file'][1], io.BytesIO)
+        self.assertTrue(files['file'][1].closed)
+
+        api_client._session.content = 'OK|abcd'
+        api_client.res(action='get', id='123')
+
+        # the same solved content is recognized by the submission cache
+        api_client._session = None
+        self.assertEqual(api_client.in_(file=('other.jpg', b'image'), method='post'),
+                         'OK|123')
+
+
+
+    def test_cache(self):
+
+        api_client = self.client('OK|123')
+        api_client.cache_ttl = 60
+
+        self.assertEqual(api_client.in_(file=file, method='post'), 'OK|123')
+
+        api_client._session.content = 'OK|abcd'
+        self.assertEqual(api_client.res(action='get', id='123'), 'OK|abcd')
+
+        # solved identical submission: neither in.php nor res.php is requested
+        api_client._session = None
+
+        self.assertEqual(api_client.in_(file=file, method='post'), 'OK|123')
+        self.assertEqual(api_client.res(action='get', id='123'), 'OK|abcd')
+
+
+
+    def test_cache_error_answer(self):
+
+        api_client = self.client('OK|123')
+        api_client.cache_ttl = 60
+
+        api_client.in_(file=file, method='post')
+
+        api_client._session.content = '{"status":0,"request":"ERROR_CAPTCHA_UNSOLVABLE"}'
+        api_client.res(action='get', id='123', json=1)
+
+        # a failed captcha is sent again instead of getting the same error
+        api_client._session.content = 'OK|456'
+        self.assertEqual(api_client.in_(file=file, method='post'), 'OK|456')
+
+
+
+    def test_compress(self):
+
+        api_client = self.client('OK|123')
+        api_client.compress = True
+
+        api_client.in_(method='userrecaptcha', cookies='a' * 2048)
+
+        kwargs = api_client._session.kwargs
+        self.assertEqual(kwargs['headers']['Content-Encoding'], 'gzip')
+        self.assertLess(len(kwargs['data']), 1024)
+
+        # server didn't understand the compressed body: sent again as is
+        api_client._session.content = 'ERROR_KEY_DOES_NOT_EXIST'
+
+        self.assertRaises(ApiException, api_client.in_, cookies='a' * 2048)
+        self.assertFalse(api_client.compress)
+        self.assertNotIn('headers', api_client._session.kwargs)
+
+
+
+    @unittest.skipIf(httpx is None, 'httpx is not installed')
+    def test_http2(self):
+
+        api_client = ApiClient(use_http2=True)
+        self.assertIsInstance(api_client._session, httpx.Client)
+        self.assertEqual(api_client._session.timeout, httpx.Timeout(10, read=60))
+
+        api_client._session = httpx.Client(transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, text='OK|abcd')))
+
+        self.assertEqual(api_client.res(action='get', id='123'), 'OK|abcd')
+        self.assertEqual(api_client.in_(file=file, method='post'), 'OK|abcd')
+
+
+
+    @unittest.skipIf(Image is None, 'Pillow is not installed')
+    def test_shrink_image(self):
+
+        api_client = self.client('OK|123')
+        api_client.max_file_size = 1024
+
+        api_client.in_(file=large_file, method='post')
+
+        kwargs = api_client._session.kwargs
+        files = kwargs.get('files') or kwargs['data'].fields
+
+        self.assertIsInstance(files['file'][1], io.BytesIO)
+        self.assertEqual(files['file'][0], 'canvas.jpg')
+
+        with open(large_file, 'rb') as f:
+            api_client.in_(file=('captcha.png', f.read()), method='post')
+
+        kwargs = api_client._session.kwargs
+        files = kwargs.get('files') or kwargs['data'].fields
+
+        self.assertEqual(files['file'][0], 'captcha.jpg')
+
+
+
+    def test_shrink_image_default(self):
+
+        self.assertIsNone(ApiClient().max_file_size)
+        self.assertEqual(TwoCaptcha('API_KEY', maxFileSize=1024).api_client.max_file_size, 1024)
+
+
+
+    def test_answer_with_error_word(self):
+
+        api_client = self.client('OK|this is an ERROR sign')
+        self.assertEqual(api_client.res(action='get', id='123'),
+                         'OK|this is an ERROR sign')
+
+
+
+    def test_res_timeout(self):
+
+        api_client = self.client('OK|abcd')
+        api_client.res(timeout=2.5, action='get', id='123')
+
+        kwargs = api_client._session.kwargs
+
+        self.assertEqual(kwargs['timeout'], 2.5)
+        self.assertEqual(kwargs['params'], {'action': 'get', 'id': '123'})
+
+
+
+    def test_error(self):
+
+        api_client = self.client('ERROR_WRONG_USER_KEY')
+        self.assertRaises(ApiException, api_client.res, action='get', id='123')
+
+
+
+    def test_metrics_hook(self):
+
+        calls = []
+
+        api_client = self.client('OK|123')
+        api_client.metrics_hook = lambda *args: calls.append(args)
+
+        api_client.in_(method='userrecaptcha')
+        api_client.res(action='get', id='123')
+
+        self.assertEqual([(c[0], c[2]) for c in calls], [('in', 6), ('res', 6)])
+
+
+
+    @unittest.skipIf(pycurl is None, 'pycurl is not installed')
+    def test_pycurl(self):
+
+        api_client = ApiClient(use_pycurl=True)
+        self.assertIsNotNone(api_client._curl)
+
+        api_client._res_url = 'file://' + file
+        resp = api_client._curl_get(api_client._res_url, {'action': 'get'})
+
+        with open(file, 'rb') as f:
+            self.assertEqual(resp.content, f.read())
+
+        api_client.close()
+
+
+
+    def test_shared_session(self):
+
+        session = requests.Session()
+        api_client = ApiClient(session=session)
+
+        self.assertIs(api_client._session, session)
+
+        # retries apply to the API host only
+        api_adapter = session.get_adapter('https://2captcha.com/res.php')
+        self.assertIsNot(api_adapter, session.get_adapter('https://example.com/a.mp3'))
+        self.assertEqual(api_adapter.max_retries.total, 3)
+
+
+
+    def test_solver_headers(self):
+
+        headers = TwoCaptcha('API_KEY').api_client._session.headers
+
+        for key, value in DEFAULT_HEADERS.items():
+            self.assertEqual(headers[key], value)
+
+
+
+    def test_retry_policy(self):
+
+        retry = _retry()
+
+        # a paid submission is never sent twice
+        self.assertTrue(retry.is_retry('GET', 503))
+        self.assertFalse(retry.is_retry('POST', 503))
+        self.assertFalse(retry._is_method_retryable('POST'))
+
+
+
+    def test_solver_backend(self):
+
+        if pycurl is None:
+            self.assertRaises(ImportError, TwoCaptcha, 'API_KEY', httpBackend='pycurl')
+        else:
+            self.assertIsNotNone(TwoCaptcha('API_KEY', httpBackend='pycurl').api_client._curl)
+
+        self.assertRaises(ValueError, TwoCaptcha, 'API_KEY', httpBackend='urllib')
+
+
+
+    def test_res_batch(self):
+
+        api_client = self.client('abcd|CAPCHA_NOT_READY|efgh')
+        answers = api_client.res_batch('API_KEY', [1, 2, 3])
+
+        self.assertEqual(api_client._session.kwargs['params']['ids'], '1,2,3')
+        self.assertEqual(answers, {'1': Answer('OK', 'abcd'),
+                                   '2': Answer('CAPCHA_NOT_READY', None),
+                                   '3': Answer('OK', 'efgh')})
+
+
+
+    def test_res_batch_ok_prefixed(self):
+
+        api_client = self.client('OK|abcd|OK|efgh')
+        answers = api_client.res_batch('API_KEY', ['1', '2'])
+
+        self.assertEqual(answers, {'1': Answer('OK', 'abcd'),
+                                   '2': Answer('OK', 'efgh')})
+
+
+
+
+if __name__ == '__main__':
+
+    unittest.main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+
+import unittest
+import asyncio
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from twocaptcha import AsyncApiClient, Answer
+from twocaptcha.async_api import httpx
+
+
+
+@unittest.skipIf(httpx is None, 'httpx is not installed')
+class AsyncApiClientTest(unittest.TestCase):
+
+    def client(self, content):
+
+        def handler(request):
+
+            self.request = request
+            return httpx.Response(200, text=content)
+
+        api_client = AsyncApiClient()
+        api_client._session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        return api_client
+
+
+
+    def test_in(self):
+
+        api_client = self.client('OK|123')
+        resp = asyncio.run(api_client.in_(method='userrecaptcha', key='API_KEY'))
+
+        self.assertEqual(resp, 'OK|123')
+        self.assertEqual(self.request.url.path, '/in.php')
+
+
+
+    def test_res_many(self):
+
+        api_client = self.client('abcd|CAPCHA_NOT_READY')
+        answers = asyncio.run(api_client.res_many('API_KEY', [1, 2]))
+
+        self.assertEqual(self.request.url.params['ids'], '1,2')
+        self.assertEqual(answers, {'1': Answer('OK', 'abcd'),
+                                   '2': Answer('CAPCHA_NOT_READY', None)})
+
+
+
+
+if __name__ == '__main__':
+
+    unittest.main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+import unittest
+import asyncio
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from twocaptcha import AsyncTwoCaptcha, ApiException, Answer
+
+try:
+    from .abstract import Response
+except ImportError:
+    from abstract import Response
+
+
+class AsyncApiClient():
+    def __init__(self):
+
+        self.answers = ['CAPCHA_NOT_READY', 'OK|abcd']
+
+    async def in_(self, files={}, **kwargs):
+
+        self.incomings = kwargs
+        return 'OK|123'
+
+    async def res(self, **kwargs):
+
+        return self.answers.pop(0)
+
+    def is_cached(self, **kwargs):
+
+        return False
+
+    async def res_many(self, key, ids):
+
+        self.batch = ids
+        return {id_: Answer('OK', 'abcd') for id_ in ids}
+
+
+
+class AsyncSolverTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self.solver = AsyncTwoCaptcha('API_KEY', pollingInterval=0.01)
+        self.solver.api_client = AsyncApiClient()
+
+
+
+    def test_recaptcha(self):
+
+        result = asyncio.run(self.solver.recaptcha(sitekey='key', url='https://site'))
+
+        self.assertEqual(result, {'captchaId': '123', 'code': 'abcd'})
+        self.assertEqual(self.solver.api_client.incomings['method'], 'userrecaptcha')
+        self.assertEqual(self.solver.api_client.incomings['pageurl'], 'https://site')
+
+
+
+    def test_solve_many(self):
+
+        self.solver.api_client.answers = ['OK|abcd', 'ERROR_CAPTCHA_UNSOLVABLE']
+
+        results = asyncio.run(self.solver.solve_many('userrecaptcha', [
+            {'googlekey': 'key', 'pageurl': 'https://site/1'},
+            {'googlekey': 'key', 'pageurl': 'https://site/2'},
+        ], max_concurrent=1))
+
+        self.assertEqual(results[0], {'captchaId': '123', 'code': 'abcd'})
+        self.assertIsInstance(results[1], ApiException)
+
+
+
+    def test_wait_results(self):
+
+        answers = asyncio.run(self.solver.wait_results(['1', '2']))
+
+        self.assertEqual(sorted(self.solver.api_client.batch), ['1', '2'])
+        self.assertEqual(answers, {'1': 'abcd', '2': 'abcd'})
+
+        self.solver.api_client.answers = ['CAPCHA_NOT_READY', 'ERROR_CAPTCHA_UNSOLVABLE']
+        answers = asyncio.run(self.solver.wait_results(['3']))
+
+        self.assertIsInstance(answers['3'], ApiException)
+
+
+
+    def test_http_backend(self):
+
+        self.assertRaises(ValueError, AsyncTwoCaptcha, 'API_KEY', httpBackend='pycurl')
+        self.assertRaises(ValueError, AsyncTwoCaptcha, 'API_KEY', httpBackend='urllib')
+
+
+
+    def test_downloads(self):
+
+        downloads = []
+
+        def get(url, **kwargs):
+            downloads.append(url)
+            return Response(url[-3:].encode())
+
+        self.solver._http.get = get
+        self.solver.api_client.answers = ['OK|abcd']
+
+        asyncio.run(self.solver.canvas('https://site/abc', hintText='Draw around apple',
+                                       hintImg='https://site/def'))
+
+        incomings = self.solver.api_client.incomings
+
+        self.assertEqual(sorted(downloads), ['https://site/abc', 'https://site/def'])
+        self.assertEqual(incomings['file'], ('abc', b'abc'))
+        self.assertEqual(incomings['imginstructions'], 'ZGVm')
+
+
+
+    def test_error(self):
+
+        self.solver.api_client.answers = ['ERROR_CAPTCHA_UNSOLVABLE']
+
+        self.assertRaises(ApiException, asyncio.run,
+                          self.solver.text('If tomorrow is Saturday, what day is today?'))
+
+
+
+
+if __name__ == '__main__':
+
+    unittest.main()
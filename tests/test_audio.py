@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+import unittest
+import base64
+
+file = '../examples/audio/example.mp3'
+
+try:
+    from .abstract import AbstractTest, Response
+
+    file = file[3:]
+
+except ImportError:
+    from abstract import AbstractTest, Response
+
+
+
+class AudioTest(AbstractTest):
+
+    def test_file(self):
+
+        with open(file, 'rb') as f:
+            body = base64.b64encode(f.read()).decode('ascii')
+
+        sends = {'method': 'audio', 'body': body, 'lang': 'en'}
+        return self.send_return(sends, self.solver.audio, file=file, lang='en')
+
+
+
+    def test_base64(self):
+
+        b64 = 'AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA'
+        sends = {'method': 'audio', 'body': b64, 'lang': 'en'}
+
+        return self.send_return(sends, self.solver.audio, file=b64, lang='en')
+
+
+
+    def test_data_uri(self):
+
+        uri = 'data:audio/mpeg;base64,' + 'A' * 60
+        sends = {'method': 'audio', 'body': uri, 'lang': 'en'}
+
+        return self.send_return(sends, self.solver.audio, file=uri, lang='en')
+
+
+
+    def test_url(self):
+
+        url = 'https://example.com/captcha.mp3'
+        response = Response([b'ab', b'cde', b'f'])
+        self.solver._http.get = lambda url, **kwargs: response
+
+        sends = {'method': 'audio', 'body': 'YWJjZGVm', 'lang': 'en'}
+        self.send_return(sends, self.solver.audio, file=url, lang='en')
+
+        self.assertTrue(response.closed)
+
+
+
+    def test_not_found(self):
+
+        self.assertRaises(self.solver.exceptions, self.solver.audio, 'lost_file.mp3', lang='en')
+
+
+
+    def test_wrong_lang(self):
+
+        self.assertRaises(self.solver.exceptions, self.solver.audio, file, lang='xx')
+
+
+
+
+if __name__ == '__main__':
+
+    unittest.main()
@@ -46,6 +46,24 @@ class CanvasTest(AbstractTest):
 
 
 
+    def test_base64_hint_img(self):
+
+        b64 = 'AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA'
+        sends = {
+                'method': 'base64',
+                'body'  : b64,
+                'files' : {'imginstructions': hint_img},
+                **checks,
+                }
+
+        self.send_return(sends, self.solver.canvas, file=b64, hintText=hint,
+                         hintImg=hint_img)
+
+        self.assertEqual(self.solver.api_client.incoming_files,
+                         {'imginstructions': hint_img})
+
+
+
     def test_all_params(self):
         
         
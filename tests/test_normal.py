@@ -1,19 +1,21 @@
 #!/usr/bin/env python3
 
 import unittest
+import base64
+from unittest import mock
 
 file = '../examples/images/normal.jpg'
 hint_img = '../examples/images/grid_hint.jpg'
 
 
 try:
-    from .abstract import AbstractTest
+    from .abstract import AbstractTest, Response
 
     file = file[3:]
     hint_img = hint_img[3:]
     
 except ImportError:
-    from abstract import AbstractTest
+    from abstract import AbstractTest, Response
 
 
 
@@ -45,6 +47,83 @@ class NormalTest(AbstractTest):
 
 
 
+    def test_data_uri(self):
+
+        with open(file, 'rb') as f:
+            uri = 'data:image/jpeg;base64,' + base64.b64encode(f.read()).decode('ascii')
+
+        sends = {
+                'method': 'base64',
+                'body'  : uri,
+                }
+
+        return self.send_return(sends, self.solver.normal, file=uri)
+
+
+
+    def test_url_cached(self):
+
+        url = 'https://example.com/captcha.jpg'
+        downloads = []
+
+        def get(url, **kwargs):
+            downloads.append(url)
+            return Response(b'image')
+
+        self.solver._http.get = get
+
+        # a captcha URL is downloaded again by default
+        self.solver.normal(url)
+        self.solver.normal(url)
+
+        self.assertEqual(downloads, [url, url])
+        self.assertEqual(self.solver._downloads_size, 0)
+
+        self.solver.download_cache_ttl = 60
+
+        self.solver.normal(url)
+        self.solver.normal(url)
+
+        self.assertEqual(downloads, [url, url, url])
+        self.assertEqual(self.solver.api_client.incomings,
+                         {'method': 'post', 'file': ('captcha.jpg', b'image'),
+                          'key': 'API_KEY', 'soft_id': 4580})
+
+
+
+    def test_url_filename(self):
+
+        png = b'\x89PNG\r\n\x1a\n' + b'image'
+        jpeg = b'\xff\xd8\xff' + b'image'
+
+        # in.php checks the extension, it's taken from the image itself
+        for url, content, name in (('https://example.com/captcha.php?id=3', png, 'captcha.png'),
+                                   ('https://example.com/captcha?id=3', jpeg, 'captcha.jpg'),
+                                   ('https://example.com/', png, 'captcha.png')):
+
+            self.solver._http.get = lambda url, **kwargs: Response(content)
+            self.solver.normal(url)
+
+            self.assertEqual(self.solver.api_client.incomings['file'], (name, content))
+
+
+
+    def test_url_cache_size(self):
+
+        self.solver._http.get = lambda url, **kwargs: Response(b'image')
+        self.solver.download_cache_ttl = 60
+
+        # 5 bytes each, the oldest one didn't fit
+        with mock.patch('twocaptcha.solver.DOWNLOAD_CACHE_SIZE', 12):
+            for i in range(3):
+                self.solver.normal(f'https://example.com/{i}.jpg')
+
+        self.assertEqual(list(self.solver._downloads),
+                         ['https://example.com/1.jpg', 'https://example.com/2.jpg'])
+        self.assertEqual(self.solver._downloads_size, 10)
+
+
+
     def test_all_params(self):
 
         
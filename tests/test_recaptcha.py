@@ -2,8 +2,15 @@
 
 import unittest
 
+grid_file = '../examples/images/grid.jpg'
+normal_file = '../examples/images/normal.jpg'
+
 try:
     from .abstract import AbstractTest
+
+    grid_file = grid_file[3:]
+    normal_file = normal_file[3:]
+
 except ImportError:
     from abstract import AbstractTest
 
@@ -36,6 +43,21 @@ class RecaptchaTest(AbstractTest):
         return self.send_return(sends, self.solver.recaptcha, **params)
 
 
+    def test_method_override(self):
+
+        params = {
+                'sitekey'   : '6Le-wvkSVVABCPBMRTvw0Q4Muexq1bi0DJwx_mJ-',
+                'url'       : 'https://mysite.com/page/with/recaptcha',
+                'version'   : 'v3',
+                }
+
+        # fixed params may be overridden by the caller
+        self.solver.recaptcha(method='userrecaptcha', enterprise=1, **params)
+
+        self.assertEqual(self.solver.api_client.incomings['method'], 'userrecaptcha')
+        self.assertEqual(self.solver.api_client.incomings['enterprise'], 1)
+
+
     def test_v3(self):
         
         params = {
@@ -60,6 +82,36 @@ class RecaptchaTest(AbstractTest):
 
 
 
+    def test_learned_delay(self):
+
+        self.assertEqual(self.solver._initial_delay('userrecaptcha'), 15)
+
+        self.solver._learn_solve_time('userrecaptcha', 20)
+        self.assertEqual(self.solver._initial_delay('userrecaptcha'), 16)
+
+        self.solver._learn_solve_time('userrecaptcha', 10)
+        self.assertAlmostEqual(self.solver._initial_delay('userrecaptcha'), 13.6)
+
+        self.solver.recaptcha(sitekey='key', url='https://mysite.com/page')
+        self.assertLess(self.solver._solve_times['userrecaptcha'], 17)
+
+
+    def test_learned_delay_by_type(self):
+
+        self.solver.grid(grid_file, hintText='Select all images with an Orange')
+        self.solver.text('If tomorrow is Saturday, what day is today?')
+
+        # image captchas sent with method=post are learned apart
+        self.assertEqual(sorted(self.solver._solve_times), ['grid', 'text'])
+
+        # an answer served from the cache is neither waited for nor learned
+        self.solver.api_client.is_cached = lambda **kwargs: True
+        self.solver.normal(normal_file)
+
+        self.assertNotIn('normal', self.solver._solve_times)
+
+
+
 if __name__ == '__main__':
 
     unittest.main()
@@ -39,6 +39,15 @@ class RotateTest(AbstractTest):
 
 
 
+    def test_base64(self):
+
+        b64 = 'AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA'
+        sends = {'body': b64, **checks}
+
+        return self.send_return(sends, self.solver.rotate, files=b64)
+
+
+
     def test_file_param(self):
         
         sends = {'method': 'post',
@@ -56,6 +65,25 @@ class RotateTest(AbstractTest):
 
 
 
+    def test_preread(self):
+
+        with open(files[0], 'rb') as f:
+            content = f.read()
+
+        sends = {'method': 'post',
+                 'files': {'file_1': ('rotate.jpg', content)},
+                 **checks}
+
+        self.send_return(sends, self.solver.rotate, files=files, preread=True)
+
+        # not sent as an API param with a single file either
+        self.solver.rotate(files[0], preread=True)
+        self.assertNotIn('preread', self.solver.api_client.incomings)
+
+        self.assertEqual(self.solver.extract_files([], preread=True), {})
+
+
+
     def test_files_dict(self):
         
         sends = {'method': 'post', 'files': files_dict, **checks}
@@ -92,6 +120,13 @@ class RotateTest(AbstractTest):
 
 
 
+    def test_one_of_many_not_found(self):
+
+        self.assertRaises(self.solver.exceptions, self.solver.rotate,
+                          files * 4 + ['lost_file'])
+
+
+
     def test_too_many(self):
 
         return self.too_many_files(self.solver.rotate)
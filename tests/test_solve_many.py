@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+import unittest
+import itertools
+
+try:
+    from .abstract import AbstractTest, ApiClient, code
+except ImportError:
+    from abstract import AbstractTest, ApiClient, code
+
+from twocaptcha import Answer
+from twocaptcha.api import NetworkException, ApiException
+
+
+
+class BatchApiClient(ApiClient):
+    def __init__(self):
+
+        self.ids = itertools.count(1)
+        self.batches = []
+
+    def in_(self, files={}, **kwargs):
+
+        if kwargs.get('googlekey') == 'bad':
+            raise Exception('ERROR_WRONG_GOOGLEKEY')
+
+        return 'OK|' + str(next(self.ids))
+
+    def res_batch(self, key, ids):
+
+        self.batches.append(ids)
+
+        if len(self.batches) == 1 and key == 'flaky':
+            raise NetworkException('connection reset')
+
+        return {id_: Answer('OK', code) for id_ in ids}
+
+    def res(self, **kwargs):
+
+        if kwargs['id'] == '9':
+            raise ApiException('ERROR_CAPTCHA_UNSOLVABLE')
+
+        return super().res(**kwargs)
+
+
+
+class SolveManyTest(AbstractTest):
+
+    def setUp(self):
+
+        super().setUp()
+        self.solver.api_client = BatchApiClient()
+
+
+
+    def test_batch(self):
+
+        jobs = [{'googlekey': 'key', 'pageurl': f'https://mysite.com/{i}'}
+                for i in range(3)]
+
+        results = self.solver.solve_many('userrecaptcha', jobs)
+
+        batches = self.solver.api_client.batches
+
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(sorted(batches[0]), ['1', '2', '3'])
+        self.assertEqual(sorted(results), [0, 1, 2])
+
+        for result in results.values():
+            self.assertEqual(result['code'], code)
+
+
+
+    def test_failed_job(self):
+
+        jobs = [{'googlekey': 'key'}, {'googlekey': 'bad'}]
+
+        results = self.solver.solve_many('userrecaptcha', jobs)
+
+        self.assertEqual(results[0], {'captchaId': '1', 'code': code})
+        self.assertIsInstance(results[1], Exception)
+
+
+
+
+    def test_wait_results(self):
+
+        answers = self.solver.wait_results([7, 8])
+
+        self.assertEqual(sorted(self.solver.api_client.batches[0]), ['7', '8'])
+        self.assertEqual(answers, {'7': code, '8': code})
+
+
+
+    def test_poll_many_network_error(self):
+
+        self.solver.API_KEY = 'flaky'
+
+        # the failed batch leaves every captcha pending until the next one
+        answers = self.solver.wait_results([7, 8])
+
+        self.assertEqual(len(self.solver.api_client.batches), 2)
+        self.assertEqual(answers, {'7': code, '8': code})
+
+
+
+    def test_poll_many_one_by_one(self):
+
+        answers = self.solver.poll_many(['9'])
+
+        self.assertIsInstance(answers['9'], ApiException)
+
+        # programming errors are not mistaken for a pending captcha
+        self.solver.api_client.res_batch = None
+        self.assertRaises(TypeError, self.solver.poll_many, ['8', '9'])
+
+
+
+if __name__ == '__main__':
+
+    unittest.main()
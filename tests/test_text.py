@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
 import unittest
+import time
+from unittest import mock
 
 try:
-    from .abstract import AbstractTest
+    from .abstract import AbstractTest, ApiClient, code
 except ImportError:
-    from abstract import AbstractTest
+    from abstract import AbstractTest, ApiClient, code
+
+from twocaptcha.api import NetworkException
 
 
 class TextTest(AbstractTest):
@@ -34,6 +38,81 @@ class TextTest(AbstractTest):
 
         return self.send_return(sends, self.solver.text, **params)
 
+    def test_inline_answer(self):
+
+        class InlineApiClient(ApiClient):
+            def in_(self, files={}, **kwargs):
+                return 'OK|123|monday'
+
+            def res(self, **kwargs):
+                raise AssertionError('solved captcha was polled')
+
+        self.solver.api_client = InlineApiClient()
+        result = self.solver.text('Today is monday?')
+
+        self.assertEqual(result, {'captchaId': '123', 'code': 'monday'})
+        self.assertEqual(self.solver.send(text='Today is monday?', method='post'), '123')
+
+    def test_transient_poll_error(self):
+
+        class FlakyApiClient(ApiClient):
+            polls = 0
+
+            def res(self, **kwargs):
+                self.polls += 1
+
+                if self.polls == 1:
+                    raise NetworkException('read timed out')
+
+                return super().res(**kwargs)
+
+        self.solver.api_client = FlakyApiClient()
+        result = self.solver.text('Today is monday?')
+
+        self.assertEqual(result['code'], code)
+        self.assertEqual(self.solver.api_client.polls, 2)
+
+    def test_poll_count(self):
+
+        class Clock():
+            now = 0
+
+            def monotonic(self):
+                return self.now
+
+            def sleep(self, seconds):
+                self.now += seconds
+
+        class SlowApiClient(ApiClient):
+            polls = 0
+
+            def res(self, **kwargs):
+                self.polls += 1
+                return 'OK|' + code if clock.now >= solved_at else 'CAPCHA_NOT_READY'
+
+        # solve time -> polls at a fixed 10 s interval starting right away
+        for solved_at, fixed_polls in ((5, 2), (20, 3), (30, 4), (45, 6)):
+            clock = Clock()
+            self.solver.api_client = SlowApiClient()
+
+            with mock.patch('twocaptcha.solver.time', clock):
+                self.assertEqual(self.solver.wait_result('123', 120, 10), code)
+
+            self.assertLessEqual(self.solver.api_client.polls, fixed_polls)
+
+    def test_timeout_not_overshot(self):
+
+        class PendingApiClient(ApiClient):
+            def res(self, **kwargs):
+                return 'CAPCHA_NOT_READY'
+
+        self.solver.api_client = PendingApiClient()
+        started = time.monotonic()
+
+        # the first backoff sleep (2 s) is cut short at the deadline
+        self.assertRaises(self.solver.exceptions, self.solver.wait_result, '123', 0.5, 10)
+        self.assertLess(time.monotonic() - started, 1.5)
+
 
 if __name__ == '__main__':
 
@@ -31,6 +31,24 @@ class TurnstileTest(AbstractTest):
         return self.send_return(sends, self.solver.turnstile, **params)
 
 
+
+    def test_token_cache(self):
+
+        self.solver.token_cache_ttl = {'turnstile': 60}
+        params = {'sitekey': '0x4AAAAAAAC3DHQFLr1GavRN', 'url': 'https://www.site.com/page/'}
+
+        first = self.solver.turnstile(**params)
+
+        # a second solve would overwrite the recorded submission
+        self.solver.api_client.incomings = None
+        self.assertEqual(self.solver.turnstile(**params), first)
+        self.assertIsNone(self.solver.api_client.incomings)
+
+        self.solver.report(first['captchaId'], False)
+        self.solver.turnstile(**params)
+        self.assertIsNotNone(self.solver.api_client.incomings)
+
+
 if __name__ == '__main__':
 
     unittest.main()
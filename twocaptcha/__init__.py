@@ -1,4 +1,6 @@
-from .api import ApiClient
+from .api import ApiClient, Answer
+from .async_api import AsyncApiClient
+from .async_solver import AsyncTwoCaptcha
 from .solver import (TwoCaptcha, SolverExceptions, ValidationException,
                      NetworkException, ApiException, TimeoutException)
 
@@ -1,6 +1,157 @@
 #!/usr/bin/env python3
 
+import io
+import os
+import time
+import json
+import gzip
+import hashlib
+import threading
+from collections import namedtuple
+from urllib.parse import urlencode
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import httpx
+
+except ImportError:
+    httpx = None
+
+try:
+    import pycurl
+
+except ImportError:
+    pycurl = None
+
+try:
+    from PIL import Image
+
+except ImportError:
+    Image = None
+
+try:
+    from requests_toolbelt.multipart.encoder import MultipartEncoder
+
+except ImportError:
+    MultipartEncoder = None
+
+
+DEFAULT_HEADERS = {
+    'User-Agent': '2captcha-python',
+    'Accept': 'text/plain, application/json',
+}
+
+
+# read buffer for upload files, matches a typical socket send buffer
+UPLOAD_BUFFER_SIZE = 64 * 1024
+
+# form bodies shorter than this are not worth compressing
+COMPRESS_MIN_SIZE = 1024
+
+# errors meaning the server didn't parse a compressed body at all
+COMPRESS_REJECTED = (b'ERROR_KEY_DOES_NOT_EXIST', b'ERROR_WRONG_USER_KEY')
+
+
+# parsed res.php answer: status is 'OK', 'CAPCHA_NOT_READY' or an ERROR_XXX
+# code, payload is the answer text (None if there's no one)
+Answer = namedtuple('Answer', ['status', 'payload'])
+
+
+# minimal response object for the pycurl transport
+_CurlResponse = namedtuple('_CurlResponse', ['status_code', 'content'])
+
+
+def parse_answer(resp):
+    '''splits an 'OK|answer' / 'CAPCHA_NOT_READY' response into an Answer'''
+
+    parts = resp.split('|', 1)
+    return Answer(parts[0], parts[1] if len(parts) == 2 else None)
+
+
+def _retry():
+    '''
+    transport-level retry policy: connection errors, read errors and 5xx
+    responses are retried with backoff on the pooled connection, callers
+    only see NetworkException once all attempts have failed
+
+    only GET-requests are retried once they have been sent: a submission
+    to in.php is paid, so a POST is retried on connection errors alone,
+    when the server can't have received it
+    '''
+
+    params = dict(total=3,
+                  connect=3,
+                  read=2,
+                  backoff_factor=0.3,
+                  status_forcelist=(500, 502, 503, 504))
+    methods = frozenset(['GET'])
+
+    try:
+        return Retry(allowed_methods=methods, **params)
+
+    except TypeError:
+        # urllib3 < 1.26
+        return Retry(method_whitelist=methods, **params)
+
+
+def _shrink_image(path, size):
+    '''re-encodes an image as JPEG, None if that doesn't make it smaller'''
+
+    buf = io.BytesIO()
+
+    try:
+        with Image.open(path) as img:
+            img.convert('RGB').save(buf, 'JPEG', quality=85, optimize=True)
+
+    except (OSError, ValueError):
+        return None
+
+    if buf.tell() >= size:
+        return None
+
+    buf.seek(0)
+    return buf
+
+
+def _upload_name(path):
+    '''file name of an upload: a path or a (filename, content) tuple'''
+
+    return path[0] if isinstance(path, tuple) else os.path.basename(path)
+
+
+def _open_upload(path, max_bytes=None):
+    '''opens an upload, returns its (filename, file object)'''
+
+    name = _upload_name(path)
+
+    if isinstance(path, tuple):
+        source = io.BytesIO(path[1])
+        size = len(path[1])
+    else:
+        source = path
+        size = os.stat(path).st_size
+
+    if max_bytes and size > max_bytes and Image is not None:
+        shrunk = _shrink_image(source, size)
+
+        # the upload is named after its new format
+        if shrunk is not None:
+            return os.path.splitext(name)[0] + '.jpg', shrunk
+
+    if isinstance(path, tuple):
+        source.seek(0)
+        return name, source
+
+    f = open(path, 'rb', buffering=UPLOAD_BUFFER_SIZE)
+
+    # fill the read buffer now so the first chunk is ready to be sent
+    f.peek(1)
+    return name, f
 
 
 class NetworkException(Exception):
@@ -12,10 +163,127 @@ class ApiException(Exception):
 
 
 class ApiClient():
-    def __init__(self, post_url = '2captcha.com'):
+    def __init__(self, post_url = '2captcha.com', cache_ttl=0, use_http2=False,
+                 compress=False, max_file_size=None, metrics_hook=None,
+                 use_pycurl=False, session=None):
         self.post_url = post_url
-        
-        
+        # called as metrics_hook(endpoint, seconds, response_bytes) after
+        # every request, endpoint is 'in' or 'res'
+        self.metrics_hook = metrics_hook
+        # images larger than max_file_size bytes are re-encoded as JPEG
+        # before upload (needs Pillow), None disables it
+        self.max_file_size = max_file_size
+        self.use_http2 = use_http2
+        self.compress = compress
+        self._in_url = f'https://{post_url}/in.php'
+        self._res_url = f'https://{post_url}/res.php'
+
+        # keep-alive session: submission and all subsequent polls reuse one
+        # TLS connection instead of doing a full handshake per request; an
+        # existing requests.Session may be passed in to share its pool
+        self._session = self._create_session(session)
+
+        # res.php polls go through one long-lived libcurl handle if requested,
+        # otherwise through the session
+        self._curl = self._create_curl() if use_pycurl else None
+        self._curl_lock = threading.Lock()
+
+        # identical image submissions are answered from here for cache_ttl
+        # seconds after they were first solved; 0 disables the cache
+        self.cache_ttl = cache_ttl
+        self._submissions = {}  # digest -> captcha id
+        self._submitted = {}    # captcha id -> digest
+        self._answers = {}      # captcha id -> [expiry, {json: response}]
+
+    def _create_session(self, session=None):
+
+        if self.use_http2:
+            return self._create_http2_session()
+
+        if session is None:
+            session = requests.Session()
+            session.headers.update(DEFAULT_HEADERS)
+
+        # mounted for the API host only, so a shared session keeps its own
+        # adapters (and retry policy) for every other URL
+        session.mount(f'https://{self.post_url}/', HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=32,
+            max_retries=_retry()))
+
+        return session
+
+    def _create_http2_session(self):
+        '''
+        httpx client multiplexing all concurrent requests over a single
+        HTTP/2 connection
+        '''
+
+        if httpx is None:
+            raise ImportError('use_http2 requires httpx: '
+                              'pip3 install 2captcha-python[http2]')
+
+        return httpx.Client(
+            transport=httpx.HTTPTransport(http2=True, retries=3),
+            headers=DEFAULT_HEADERS,
+            limits=httpx.Limits(max_connections=10),
+            # uploads and slow answers need more than httpx's 5 s default
+            timeout=httpx.Timeout(10, read=60))
+
+    def _create_curl(self):
+
+        if pycurl is None:
+            raise ImportError('use_pycurl requires pycurl: '
+                              'pip3 install 2captcha-python[curl]')
+
+        curl = pycurl.Curl()
+        curl.setopt(pycurl.TCP_KEEPALIVE, 1)
+        curl.setopt(pycurl.FORBID_REUSE, 0)
+        curl.setopt(pycurl.HTTPHEADER,
+                    [f'{key}: {value}' for key, value in DEFAULT_HEADERS.items()])
+
+        if hasattr(pycurl, 'PIPEWAIT'):
+            curl.setopt(pycurl.PIPEWAIT, 1)
+
+        return curl
+
+    def _curl_get(self, url, params, timeout=None):
+
+        buf = io.BytesIO()
+
+        with self._curl_lock:
+            self._curl.setopt(pycurl.TIMEOUT_MS, int(timeout * 1000) if timeout else 0)
+            self._curl.setopt(pycurl.URL, url + '?' + urlencode(params))
+            self._curl.setopt(pycurl.WRITEDATA, buf)
+            self._curl.perform()
+
+            status_code = self._curl.getinfo(pycurl.RESPONSE_CODE)
+
+        return _CurlResponse(status_code, buf.getvalue())
+
+    @property
+    def _network_errors(self):
+
+        errors = (requests.RequestException,)
+
+        if httpx is not None:
+            errors += (httpx.HTTPError,)
+
+        if pycurl is not None:
+            errors += (pycurl.error,)
+
+        return errors
+
+    def close(self):
+        '''
+        closes the underlying HTTP session and its pooled connections
+        '''
+
+        self._session.close()
+
+        if self._curl is not None:
+            self._curl.close()
+
     def in_(self, files={}, **kwargs):
         '''
         
@@ -42,47 +310,258 @@ class ApiClient():
 
         '''
 
-        try:
-            current_url = 'https://'+self.post_url+'/in.php'
-            if files:
+        digest = self._digest(files, kwargs) if self.cache_ttl else None
+        cached = self._cached_submission(digest)
+
+        if cached:
+            return cached
 
-                files = {key: open(path, 'rb') for key, path in files.items()}
-                resp = requests.post(current_url,
-                                     data=kwargs,
-                                     files=files)
+        started = time.perf_counter()
 
-                [f.close() for f in files.values()]
+        try:
+            if not files and 'file' in kwargs:
+                files = {'file': kwargs.pop('file')}
 
-            elif 'file' in kwargs:
+            # in.php takes uploads only as multipart/form-data fields, so even
+            # a single image can't be posted as a raw request body
+            if files:
 
-                with open(kwargs.pop('file'), 'rb') as f:
-                    resp = requests.post(current_url,
-                                         data=kwargs,
-                                         files={'file': f})
+                with ExitStack() as stack:
+                    resp = self._post_files(kwargs,
+                                            self._open_files(stack, files))
 
             else:
-                resp = requests.post(current_url,
-                                     data=kwargs)
+                resp = self._post_form(kwargs)
 
-        except requests.RequestException as e:
+        except self._network_errors as e:
             raise NetworkException(e)
 
+        self._measure('in', started, resp)
+        resp = self._check(resp)
+
+        if digest and resp.startswith('OK|'):
+            self._remember(digest, resp[3:].split('|', 1)[0])
+
+        return resp
+
+    def _measure(self, endpoint, started, resp):
+
+        if self.metrics_hook is not None:
+            self.metrics_hook(endpoint, time.perf_counter() - started, len(resp.content))
+
+    def _check(self, resp):
+        '''
+        validates HTTP response, returns its decoded body
+        '''
+
         if resp.status_code != 200:
             raise NetworkException(f'bad response: {resp.status_code}')
 
-        resp = resp.content.decode('utf-8')
+        body = resp.content
 
-        if 'ERROR' in resp:
-            raise ApiException(resp)
+        # errors come as ERROR_XXX, answers themselves may contain the word;
+        # checked on the raw bytes so the body is decoded only once
+        if body.startswith(b'ERROR'):
+            raise ApiException(body.decode('utf-8', 'replace'))
 
-        return resp
+        return body.decode('utf-8')
+
+    def _digest(self, files, params):
+        '''
+        hash of the uploaded image(s) and all other params, None if the
+        request doesn't contain an image
+        '''
 
-    def res(self, **kwargs):
+        paths = dict(files)
+        if 'file' in params:
+            paths['file'] = params['file']
+
+        if not paths and 'body' not in params:
+            return None
+
+        digest = hashlib.blake2b(digest_size=16)
+
+        for key in sorted(paths):
+            digest.update(key.encode('utf-8'))
+
+            if isinstance(paths[key], tuple):
+                digest.update(paths[key][1])
+                continue
+
+            with open(paths[key], 'rb') as f:
+                for chunk in iter(lambda: f.read(UPLOAD_BUFFER_SIZE), b''):
+                    digest.update(chunk)
+
+        other = {k: v for k, v in params.items() if k != 'file'}
+        digest.update(json.dumps(other, sort_keys=True, default=str).encode('utf-8'))
+
+        return digest.hexdigest()
+
+    def _cached_submission(self, digest):
+        '''
+        in.php response for an identical submission solved within cache_ttl
+        '''
+
+        id_ = self._submissions.get(digest)
+        answer = self._answers.get(id_)
+
+        if answer and answer[0] > time.monotonic():
+            return 'OK|' + id_
+
+    def _cached_answer(self, params):
+        '''
+        stored res.php response for a cached submission, None if there is no
+        one; also drops the cache entry of a captcha reported as bad
+        '''
+
+        id_ = str(params.get('id'))
+
+        if params.get('action') == 'reportbad':
+            self._forget(id_)
+
+        if params.get('action') != 'get' or id_ not in self._submitted:
+            return None
+
+        answer = self._answers.get(id_)
+        mode = bool(params.get('json'))
+
+        if answer and answer[0] > time.monotonic():
+            return answer[1].get(mode)
+
+    def is_cached(self, **kwargs):
+        '''
+        tells if a res.php request with these params is answered from the
+        cache, without a request
+        '''
+
+        return self._cached_answer(kwargs) is not None
+
+    def _store_answer(self, params, resp):
+
+        id_ = str(params.get('id'))
+
+        if params.get('action') != 'get' or id_ not in self._submitted:
+            return
+
+        if self._solved(resp, bool(params.get('json'))):
+            answer = self._answers.setdefault(id_, [time.monotonic() + self.cache_ttl, {}])
+            answer[1][bool(params.get('json'))] = resp
+
+    def _solved(self, resp, json_mode):
+        '''
+        tells a solved res.php answer from an error or CAPCHA_NOT_READY, in
+        json mode errors come with status 0 and pass _check
+        '''
+
+        if not json_mode:
+            return resp.startswith('OK|')
+
+        try:
+            return json.loads(resp).get('status') == 1
+
+        except (ValueError, AttributeError):
+            return False
+
+    def _remember(self, digest, id_):
+
+        if len(self._submitted) > 4096:
+            now = time.monotonic()
+            for old_id in list(self._submitted):
+                answer = self._answers.get(old_id)
+                if not answer or answer[0] <= now:
+                    self._forget(old_id)
+
+        self._submissions[digest] = id_
+        self._submitted[id_] = digest
+
+    def _forget(self, id_):
+
+        self._answers.pop(id_, None)
+        self._submissions.pop(self._submitted.pop(id_, None), None)
+
+    def _open_files(self, stack, files):
+        '''
+        opens upload files (concurrently if there are several of them) and
+        registers them in the ExitStack, returns multipart fields
+        '''
+
+        paths = list(files.values())
+
+        if len(paths) > 1:
+
+            with ThreadPoolExecutor(max_workers=min(6, len(paths))) as pool:
+                futures = [pool.submit(_open_upload, p, self.max_file_size)
+                           for p in paths]
+
+            # register every opened file before re-raising the first error
+            for future in futures:
+                if future.exception() is None:
+                    stack.enter_context(future.result()[1])
+
+            uploads = [future.result() for future in futures]
+
+        else:
+            uploads = [_open_upload(paths[0], self.max_file_size)]
+            stack.enter_context(uploads[0][1])
+
+        return {
+            key: (name, f, 'application/octet-stream')
+            for key, (name, f) in zip(files, uploads)
+        }
+
+    def _post_form(self, data):
+        '''
+        posts url-encoded params, gzip-compressed if compress is enabled;
+        compression is switched off for good once the server rejects it
+        '''
+
+        if self.compress:
+            body = urlencode({k: v for k, v in data.items() if v is not None})
+
+            if len(body) >= COMPRESS_MIN_SIZE:
+                body = gzip.compress(body.encode('utf-8'))
+                headers = {'Content-Encoding': 'gzip',
+                           'Content-Type': 'application/x-www-form-urlencoded'}
+
+                if self.use_http2:
+                    resp = self._session.post(self._in_url, content=body, headers=headers)
+                else:
+                    resp = self._session.post(self._in_url, data=body, headers=headers)
+
+                if (resp.status_code not in (400, 415)
+                        and not resp.content.startswith(COMPRESS_REJECTED)):
+                    return resp
+
+                self.compress = False
+
+        return self._session.post(self._in_url, data=data)
+
+    def _post_files(self, data, files):
+        '''
+        posts a multipart body, streamed straight from the open files when
+        requests-toolbelt is installed instead of being built in memory
+        '''
+
+        if MultipartEncoder is None or self.use_http2:
+            return self._session.post(self._in_url, data=data, files=files)
+
+        fields = {key: str(value) for key, value in data.items()
+                  if value is not None}
+        fields.update(files)
+
+        encoder = MultipartEncoder(fields=fields)
+        return self._session.post(self._in_url,
+                                  data=encoder,
+                                  headers={'Content-Type': encoder.content_type})
+
+    def res(self, timeout=None, **kwargs):
         '''
         sends additional GET-requests (solved captcha, balance, report etc.)
 
         Parameters
         ----------
+        timeout : float, optional
+            timeout of the request in seconds, the session default if None.
         **kwargs : TYPE
             DESCRIPTION.
 
@@ -100,19 +579,74 @@ class ApiClient():
 
         '''
 
-        try:
-            current_url_out = 'https://'+self.post_url+'/res.php'
-            resp = requests.get(current_url_out, params=kwargs)
+        cached = self._cached_answer(kwargs)
 
-            if resp.status_code != 200:
-                raise NetworkException(f'bad response: {resp.status_code}')
+        if cached is not None:
+            return cached
 
-            resp = resp.content.decode('utf-8')
+        started = time.perf_counter()
 
-            if 'ERROR' in resp:
-                raise ApiException(resp)
+        try:
+            if self._curl is not None:
+                resp = self._curl_get(self._res_url, kwargs, timeout)
+            elif timeout is not None:
+                resp = self._session.get(self._res_url, params=kwargs, timeout=timeout)
+            else:
+                resp = self._session.get(self._res_url, params=kwargs)
 
-        except requests.RequestException as e:
+        except self._network_errors as e:
             raise NetworkException(e)
 
+        self._measure('res', started, resp)
+        resp = self._check(resp)
+        self._store_answer(kwargs, resp)
+
         return resp
+
+    def res_batch(self, key, ids):
+        '''
+        polls several captchas with a single GET-request (action=get&ids=...)
+
+        Parameters
+        ----------
+        key : str
+            API key.
+        ids : list
+            IDs of the captchas sent for solution.
+
+        Raises
+        ------
+        NetworkException
+            on connection errors and non-200 responses.
+        ApiException
+            if the server responds with an error.
+
+        Returns
+        -------
+        answers : dict
+            {id: Answer}, payload is None for captchas that are not ready yet.
+
+        '''
+
+        ids = [str(id_) for id_ in ids]
+        resp = self.res(key=key, action='get', ids=','.join(ids))
+
+        return self._split_batch(ids, resp)
+
+    def _split_batch(self, ids, resp):
+
+        parts = resp.split('|')
+
+        # answers may come either bare or prefixed with 'OK|'
+        if len(parts) == 2 * len(ids) and all(p == 'OK' for p in parts[::2]):
+            parts = parts[1::2]
+
+        if len(parts) != len(ids):
+            raise ApiException(f'cannot recognize response {resp}')
+
+        return {
+            id_: Answer(answer, None)
+            if answer == 'CAPCHA_NOT_READY' or answer.startswith('ERROR')
+            else Answer('OK', answer)
+            for id_, answer in zip(ids, parts)
+        }
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+
+import time
+import asyncio
+import importlib.util
+from contextlib import ExitStack
+
+try:
+    import httpx
+
+except ImportError:
+    httpx = None
+
+try:
+    from .api import ApiClient, NetworkException, DEFAULT_HEADERS
+
+except ImportError:
+    from api import ApiClient, NetworkException, DEFAULT_HEADERS
+
+
+class AsyncApiClient(ApiClient):
+    '''
+    asyncio version of ApiClient built on httpx.AsyncClient, lets one event
+    loop keep many captchas in flight instead of a thread per captcha
+    '''
+
+    def _create_session(self, session=None):
+
+        # only an httpx.AsyncClient can be shared here
+        if session is not None:
+            return session
+
+        if httpx is None:
+            raise ImportError('AsyncApiClient requires httpx: '
+                              'pip3 install 2captcha-python[async]')
+
+        # HTTP/2 lets concurrent polls share one connection, needs h2 package
+        http2 = importlib.util.find_spec('h2') is not None
+
+        return httpx.AsyncClient(http2=http2,
+                                 headers=DEFAULT_HEADERS,
+                                 limits=httpx.Limits(max_connections=100,
+                                                     max_keepalive_connections=20),
+                                 timeout=30)
+
+    async def close(self):
+        '''
+        closes the underlying HTTP client and its pooled connections
+        '''
+
+        await self._session.aclose()
+
+    async def in_(self, files={}, **kwargs):
+        '''
+        sends POST-request (files and/or params) to solve captcha, see
+        ApiClient.in_
+        '''
+
+        digest = self._digest(files, kwargs) if self.cache_ttl else None
+        cached = self._cached_submission(digest)
+
+        if cached:
+            return cached
+
+        started = time.perf_counter()
+
+        try:
+            if not files and 'file' in kwargs:
+                files = {'file': kwargs.pop('file')}
+
+            if files:
+
+                with ExitStack() as stack:
+                    resp = await self._session.post(
+                        self._in_url,
+                        data=kwargs,
+                        files=self._open_files(stack, files))
+
+            else:
+                resp = await self._session.post(self._in_url, data=kwargs)
+
+        except httpx.HTTPError as e:
+            raise NetworkException(e)
+
+        self._measure('in', started, resp)
+        resp = self._check(resp)
+
+        if digest and resp.startswith('OK|'):
+            self._remember(digest, resp[3:].split('|', 1)[0])
+
+        return resp
+
+    async def res(self, timeout=None, **kwargs):
+        '''
+        sends additional GET-requests (solved captcha, balance, report etc.),
+        see ApiClient.res
+        '''
+
+        cached = self._cached_answer(kwargs)
+
+        if cached is not None:
+            return cached
+
+        started = time.perf_counter()
+
+        try:
+            if timeout is not None:
+                resp = await self._session.get(self._res_url, params=kwargs, timeout=timeout)
+            else:
+                resp = await self._session.get(self._res_url, params=kwargs)
+
+        except httpx.HTTPError as e:
+            raise NetworkException(e)
+
+        self._measure('res', started, resp)
+        resp = self._check(resp)
+        self._store_answer(kwargs, resp)
+
+        return resp
+
+    async def res_batch(self, key, ids):
+        '''
+        polls several captchas with a single GET-request, see
+        ApiClient.res_batch
+        '''
+
+        ids = [str(id_) for id_ in ids]
+        resp = await self.res(key=key, action='get', ids=','.join(ids))
+
+        return self._split_batch(ids, resp)
+
+    async def res_many(self, key, ids, batch_size=100):
+        '''
+        polls any number of captchas, splitting them into batches of
+        batch_size IDs which are requested concurrently
+
+        Returns
+        -------
+        answers : dict
+            {id: Answer}, payload is None for captchas that are not ready yet.
+
+        '''
+
+        ids = [str(id_) for id_ in ids]
+        batches = [ids[i:i + batch_size] for i in range(0, len(ids), batch_size)]
+
+        answers = {}
+        for batch in await asyncio.gather(*(self.res_batch(key, b) for b in batches)):
+            answers.update(batch)
+
+        return answers
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+
+import time
+import random
+import asyncio
+
+try:
+    from .async_api import AsyncApiClient
+    from .solver import (TwoCaptcha, NetworkException, ApiException, TimeoutException,
+                         POLLING_START, POLLING_BACKOFF, POLLING_JITTER,
+                         _ApiNetworkException, _ApiException, _sleep_time,
+                         _captcha_type)
+
+except ImportError:
+    from async_api import AsyncApiClient
+    from solver import (TwoCaptcha, NetworkException, ApiException, TimeoutException,
+                        POLLING_START, POLLING_BACKOFF, POLLING_JITTER,
+                        _ApiNetworkException, _ApiException, _sleep_time,
+                        _captcha_type)
+
+
+class _Download():
+    '''Placeholder for media that is downloaded when the captcha is sent,
+    by calling fetch(solver, url)
+    '''
+
+    def __init__(self, fetch, url):
+        self.fetch = fetch
+        self.url = url
+
+
+class AsyncTwoCaptcha(TwoCaptcha):
+    '''asyncio version of TwoCaptcha.
+
+    Every captcha method (normal, recaptcha, hcaptcha, audio...) takes the
+    same parameters as in TwoCaptcha and returns a coroutine. Polling waits
+    with asyncio.sleep, so one event loop can keep many captchas in flight
+    instead of a thread per captcha.
+
+    Requires httpx: pip3 install 2captcha-python[async]
+    '''
+
+    def _create_api_client(self, server, cache_ttl):
+
+        # requests always go through httpx, over HTTP/2 if h2 is installed
+        if self.http_backend == 'pycurl':
+            raise ValueError("httpBackend 'pycurl' is not supported by AsyncTwoCaptcha")
+
+        return AsyncApiClient(post_url=server, cache_ttl=cache_ttl,
+                              max_file_size=self.max_file_size)
+
+    async def close(self):
+        '''Closes the HTTP clients and their pooled connections.'''
+
+        await self.api_client.close()
+        self._http.close()
+
+    async def solve(self, timeout=0, polling_interval=0, **kwargs):
+        '''Sends captcha, receives result, see TwoCaptcha.solve'''
+
+        method = kwargs.get('method')
+
+        token_key = self._token_key(kwargs)
+        cached = self._cached_token(token_key)
+
+        if cached:
+            return cached
+
+        id_, code = await self._submit(**kwargs)
+        result = {'captchaId': id_}
+
+        if self.callback is None:
+            timeout = float(timeout or self.default_timeout)
+            sleep = int(polling_interval or self.polling_interval)
+            captcha_type = _captcha_type(kwargs)
+            delay = min(self._initial_delay(captcha_type), sleep)
+
+            if code is None and self.api_client.is_cached(**self._result_query(id_)):
+                code = await self.get_result(id_)
+
+            elif code is None:
+                started = time.monotonic()
+                code = await self.wait_result(id_, timeout, sleep, delay)
+                self._learn_solve_time(captcha_type, time.monotonic() - started)
+
+            self.update_result(result, code)
+            self._store_token(token_key, method, result)
+
+            return result
+
+    async def solve_many(self, method, jobs, max_concurrent=10, timeout=0, polling_interval=0):
+        '''Solves several captchas of one type concurrently on the event loop,
+        see TwoCaptcha.solve_many. At most max_concurrent of them are in
+        flight at a time.
+
+        Returns
+
+        results : dict
+            {job index: result or the exception raised for this job}.
+        '''
+
+        semaphore = asyncio.Semaphore(max_concurrent)
+
+        async def solve(job):
+            async with semaphore:
+                return await self.solve(timeout, polling_interval, method=method, **job)
+
+        results = await asyncio.gather(*(solve(job) for job in jobs),
+                                       return_exceptions=True)
+
+        return dict(enumerate(results))
+
+    async def wait_results(self, ids, timeout=0, polling_interval=0):
+        '''Waits for several captchas sent earlier, see
+        TwoCaptcha.wait_results
+        '''
+
+        timeout = float(timeout or self.default_timeout)
+        sleep = int(polling_interval or self.polling_interval)
+
+        pending = {str(id_) for id_ in ids}
+        answers = {}
+
+        deadline = time.monotonic() + timeout
+        interval = POLLING_START * sleep
+
+        await asyncio.sleep(_sleep_time(interval, deadline))
+
+        while pending and time.monotonic() < deadline:
+
+            for id_, code in (await self.poll_many(list(pending))).items():
+                pending.discard(id_)
+                answers[id_] = code
+
+            if pending:
+                interval = min(sleep, interval * POLLING_BACKOFF)
+                await asyncio.sleep(_sleep_time(interval + random.uniform(0, POLLING_JITTER * interval),
+                                                deadline))
+
+        for id_ in pending:
+            answers[id_] = TimeoutException(f'timeout {timeout} exceeded')
+
+        return answers
+
+    async def poll_many(self, ids):
+        '''Polls several captchas, in concurrent batches when possible, see
+        TwoCaptcha.poll_many
+        '''
+
+        if len(ids) > 1 and self.extendedResponse != True:
+            try:
+                return self._batch_answers(await self.api_client.res_many(self.API_KEY, ids))
+
+            except _ApiNetworkException:
+                return {}
+
+            except _ApiException:
+                pass
+
+        results = await asyncio.gather(*(self.get_result(id_) for id_ in ids),
+                                       return_exceptions=True)
+        answers = {}
+
+        for id_, result in zip(ids, results):
+            if isinstance(result, (NetworkException, _ApiNetworkException)):
+                continue
+
+            # anything but an API error is a bug, not the captcha's result
+            if (isinstance(result, BaseException)
+                    and not isinstance(result, (ApiException, _ApiException))):
+                raise result
+
+            answers[id_] = result
+
+        return answers
+
+    async def wait_result(self, id_, timeout, polling_interval, initial_delay=0):
+        '''Polls the answer with exponential backoff and jitter, see
+        TwoCaptcha.wait_result
+        '''
+
+        deadline = time.monotonic() + timeout
+        interval = POLLING_START * polling_interval
+
+        await asyncio.sleep(_sleep_time(max(initial_delay, interval), deadline))
+
+        while True:
+            remaining = deadline - time.monotonic()
+
+            if remaining <= 0:
+                break
+
+            try:
+                return await self.get_result(id_, timeout=remaining)
+
+            except (NetworkException, _ApiNetworkException):
+
+                interval = min(polling_interval, interval * POLLING_BACKOFF)
+                await asyncio.sleep(_sleep_time(interval + random.uniform(0, POLLING_JITTER * interval),
+                                                deadline))
+
+        raise TimeoutException(f'timeout {timeout} exceeded')
+
+    # the event loop mustn't block on downloads in the captcha wrappers, they
+    # are done concurrently by send() instead
+
+    def _download(self, url):
+        return _Download(TwoCaptcha._download, url)
+
+    def _download_upload(self, url):
+        return _Download(TwoCaptcha._download_upload, url)
+
+    async def _fetch_downloads(self, *fields):
+        '''Replaces download placeholders in the given dicts with the media,
+        all of it downloaded at the same time.
+        '''
+
+        pending = [(d, k) for d in fields for k, v in d.items()
+                   if isinstance(v, _Download)]
+
+        if not pending:
+            return
+
+        loop = asyncio.get_running_loop()
+
+        downloads = await asyncio.gather(*(
+            loop.run_in_executor(None, d[k].fetch, self, d[k].url)
+            for d, k in pending))
+
+        for (d, k), download in zip(pending, downloads):
+            d[k] = download
+
+    async def send(self, **kwargs):
+        '''Manual captcha submission, see TwoCaptcha.send'''
+
+        return (await self._submit(**kwargs))[0]
+
+    async def _submit(self, **kwargs):
+
+        params, files = self._prepare_send(kwargs)
+        await self._fetch_downloads(params, files)
+
+        response = await self.api_client.in_(files=files, **params)
+
+        return self._parse_send(response)
+
+    async def get_result(self, id_, timeout=None):
+        '''Manual captcha answer polling, see TwoCaptcha.get_result'''
+
+        response = await self.api_client.res(timeout=timeout, **self._result_query(id_))
+        return self._parse_result(response)
+
+    async def balance(self):
+        '''Get my balance, see TwoCaptcha.balance'''
+
+        response = await self.api_client.res(key=self.API_KEY, action='getbalance')
+        return float(response)
+
+    async def report(self, id_, correct):
+        '''Report of solved captcha: good/bad, see TwoCaptcha.report'''
+
+        if not correct:
+            self._forget_token(id_)
+
+        rep = 'reportgood' if correct else 'reportbad'
+        await self.api_client.res(key=self.API_KEY, action=rep, id=id_)
@@ -2,15 +2,230 @@
 
 import os, sys
 import time
+import json
+import random
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
 import requests
-from base64 import b64encode
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import base64
+
+try:
+    import pybase64
+
+except ImportError:
+    pybase64 = None
 
 
 try:
-    from .api import ApiClient
+    from .api import ApiClient, parse_answer, DEFAULT_HEADERS
+    from .api import NetworkException as _ApiNetworkException
+    from .api import ApiException as _ApiException
 
 except ImportError:
-    from api import ApiClient
+    from api import ApiClient, parse_answer, DEFAULT_HEADERS
+    from api import NetworkException as _ApiNetworkException
+    from api import ApiException as _ApiException
+
+
+# a captcha is never solved right after submission: the first poll comes
+# POLLING_START times the polling interval later, then the gap between polls
+# grows by POLLING_BACKOFF (plus up to POLLING_JITTER of random jitter) until
+# it reaches the polling interval. Poll k is never earlier than k polling
+# intervals after submission, so there are no more polls than at a fixed
+# interval
+POLLING_START = 0.5
+POLLING_BACKOFF = 1.5
+POLLING_JITTER = 0.2
+
+
+def _sleep_time(seconds, deadline):
+    '''seconds to sleep, cut short so that polling stops at the deadline'''
+
+    return max(0, min(seconds, deadline - time.monotonic()))
+
+
+# methods that are never solved instantly: the first poll is deferred by this
+# many seconds (but never by more than the polling interval)
+INITIAL_DELAYS = {
+    'userrecaptcha': 15,
+}
+
+# transports for API requests: 'requests' (keep-alive session), 'http2'
+# (httpx, one multiplexed connection) or 'pycurl' (libcurl handle for polls)
+HTTP_BACKENDS = ('requests', 'http2', 'pycurl')
+
+# once a method has been solved, the first poll is deferred instead by
+# LEARNED_DELAY_FACTOR of its average solve time, a moving average where the
+# latest solve has SOLVE_TIME_WEIGHT
+LEARNED_DELAY_FACTOR = 0.8
+SOLVE_TIME_WEIGHT = 0.3
+
+# image captchas are all sent with method=post or base64, their solve times
+# are learned apart by these params (checked in this order)
+_IMAGE_CAPTCHA_TYPES = (
+    ('canvas', 'canvas'),
+    ('coordinatescaptcha', 'coordinates'),
+    ('recaptcha', 'grid'),
+    ('text', 'text'),
+    ('textcaptcha', 'text'),
+)
+
+
+def _captcha_type(params):
+    '''Captcha type whose solve time is learned: the method, or the type of
+    an image captcha.
+    '''
+
+    method = params.get('method')
+
+    if method not in ('post', 'base64'):
+        return method
+
+    for param, captcha_type in _IMAGE_CAPTCHA_TYPES:
+        if params.get(param):
+            return captcha_type
+
+    return 'normal'
+
+
+# SIMD-accelerated base64 encoder when pybase64 is installed
+_b64encode = getattr(pybase64, 'b64encode', base64.b64encode)
+
+# media is base64-encoded in chunks of this size, a multiple of 3 so that no
+# padding is produced in the middle of the output
+B64_CHUNK_SIZE = 57 * 1024
+
+
+def _b64encode_chunks(chunks):
+    '''Base64-encodes an iterable of byte chunks without joining them first,
+    carrying over the 1-2 trailing bytes that don't fill a 3-byte group.
+    '''
+
+    encoded = bytearray()
+    rest = b''
+
+    for chunk in chunks:
+        chunk = rest + chunk
+        cut = len(chunk) - len(chunk) % 3
+
+        encoded += _b64encode(memoryview(chunk)[:cut])
+        rest = chunk[cut:]
+
+    encoded += _b64encode(rest)
+    return encoded.decode('ascii')
+
+
+# characters of a (possibly line-wrapped) base64 string, deleted with
+# bytes.translate() to see if anything else is left
+_B64_CHARS = bytes(frozenset(b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+                             b'0123456789+/=\r\n'))
+
+
+def _is_base64_like(s):
+    '''Tells a base64-encoded captcha apart from a file path or URL with a
+    single C-level scan of the string, without decoding it. A data: URI is
+    checked after its first comma. URL-safe base64 (- and _) isn't
+    recognized.
+    '''
+
+    if not isinstance(s, str):
+        return False
+
+    if s.startswith('data:'):
+        s = s.partition(',')[2]
+
+    if len(s) <= 50:
+        return False
+
+    # strict encoding gives up at the first non-ASCII character, for ASCII
+    # strings it's a plain copy
+    try:
+        b = s.encode('ascii')
+
+    except UnicodeEncodeError:
+        return False
+
+    return not b.translate(None, _B64_CHARS)
+
+
+# images and audio passed as URLs are kept for downloadCacheTtl seconds (off
+# by default, most captcha URLs serve a new challenge on every request)
+DOWNLOAD_CACHE_SIZE = 32 * 1024 * 1024
+
+# at most this many solved tokens are kept when tokenCacheTtl is set
+TOKEN_CACHE_SIZE = 256
+
+# extract_files checks this many files or more for existence concurrently
+PARALLEL_STAT_MIN_FILES = 4
+
+# media passed as a link is downloaded (a file named 'httpfoo.mp3' is not)
+_URL_PREFIXES = ('http://', 'https://')
+
+# in.php only accepts uploads named .jpg, .jpeg, .gif or .png, the format of
+# a downloaded image is told by its first bytes
+_IMAGE_SIGNATURES = (
+    (b'\xff\xd8\xff', '.jpg'),
+    (b'\x89PNG\r\n\x1a\n', '.png'),
+    (b'GIF87a', '.gif'),
+    (b'GIF89a', '.gif'),
+)
+
+
+def _upload_filename(url, content):
+    '''Filename of an image downloaded from url, with the extension of its
+    actual format: captcha URLs are usually dynamic (captcha.php?id=3).
+    '''
+
+    name = os.path.basename(urlsplit(url).path) or 'captcha'
+
+    for signature, extension in _IMAGE_SIGNATURES:
+        if content.startswith(signature):
+            return (os.path.splitext(name)[0] or 'captcha') + extension
+
+    return name
+
+
+def _read_upload(path):
+    '''Reads a file into a (filename, content) upload.'''
+
+    with open(path, 'rb') as f:
+        return (os.path.basename(path), f.read())
+
+
+def _is_mp3(name):
+    '''Case-insensitive .mp3 extension test, lowercases only the last four
+    characters of what may be a long string.
+    '''
+
+    return name[-4:].lower() == '.mp3'
+
+
+# option names of the wrappers -> API parameter names (read-only)
+_RENAME_MAP = MappingProxyType({
+    'caseSensitive': 'regsense',
+    'minLen': 'min_len',
+    'maxLen': 'max_len',
+    'minLength': 'min_len',
+    'maxLength': 'max_len',
+    'hintText': 'textinstructions',
+    'hintImg': 'imginstructions',
+    'url': 'pageurl',
+    'score': 'min_score',
+    'text': 'textcaptcha',
+    'rows': 'recaptcharows',
+    'cols': 'recaptchacols',
+    'previousId': 'previousID',
+    'canSkip': 'can_no_answer',
+    'apiServer': 'api_server',
+    'softId': 'soft_id',
+    'callback': 'pingback',
+    'datas': 'data-s',
+})
 
 
 class SolverExceptions(Exception):
@@ -42,7 +257,12 @@ class TwoCaptcha():
                  recaptchaTimeout=600,
                  pollingInterval=10,
                  server = '2captcha.com',
-                 extendedResponse=None):
+                 extendedResponse=None,
+                 cacheTtl=0,
+                 httpBackend='requests',
+                 tokenCacheTtl=None,
+                 maxFileSize=None,
+                 downloadCacheTtl=0):
 
         self.API_KEY = apiKey
         self.soft_id = softId
@@ -50,11 +270,43 @@ class TwoCaptcha():
         self.default_timeout = defaultTimeout
         self.recaptcha_timeout = recaptchaTimeout
         self.polling_interval = pollingInterval
-        self.api_client = ApiClient(post_url = str(server))
+        # one connection pool for media downloads and the API itself, so
+        # repeated downloads from the same host skip the TCP/TLS handshake
+        self._http = requests.Session()
+        self._http.headers.update(DEFAULT_HEADERS)
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=32,
+                              max_retries=Retry(total=3, backoff_factor=0.3,
+                                                status_forcelist=(502, 503, 504)))
+        self._http.mount('http://', adapter)
+        self._http.mount('https://', adapter)
+
+        if httpBackend not in HTTP_BACKENDS:
+            raise ValueError(f'httpBackend must be one of {HTTP_BACKENDS}, got {httpBackend!r}')
+
+        self.http_backend = httpBackend
+        self.max_file_size = maxFileSize
+        self.api_client = self._create_api_client(str(server), cacheTtl)
+        self.download_cache_ttl = downloadCacheTtl
+        self._downloads = OrderedDict()  # url -> (expiry, base64 body)
+        self._downloads_size = 0
+        self._downloads_lock = threading.Lock()
+        self._solve_times = {}  # captcha type -> average seconds to solve
+
+        # solved tokens are reused for tokenCacheTtl[method] seconds, only for
+        # the methods listed there
+        self.token_cache_ttl = dict(tokenCacheTtl or {})
+        self._tokens = OrderedDict()  # params json -> (expiry, result)
+        self._tokens_lock = threading.Lock()
         self.max_files = 9
         self.exceptions = SolverExceptions
         self.extendedResponse = extendedResponse
 
+    def _create_api_client(self, server, cache_ttl):
+        return ApiClient(post_url=server, cache_ttl=cache_ttl, session=self._http,
+                         use_http2=self.http_backend == 'http2',
+                         use_pycurl=self.http_backend == 'pycurl',
+                         max_file_size=self.max_file_size)
+
     def normal(self, file, **kwargs):
         '''Wrapper for solving a normal captcha (image).
 
@@ -64,6 +316,7 @@ class TwoCaptcha():
             Captcha image file. * required if you submit image as a file (method=post).
         body : str
             Base64-encoded captcha image. * required if you submit image as Base64-encoded string (method=base64).
+            May be a data: URI. URL-safe base64 (with - and _) is not recognized.
         phrase : int, optional
             0 - captcha contains one word. 1 - captcha contains two or more words.
             Default: 0.
@@ -118,23 +371,25 @@ class TwoCaptcha():
 
         if not file:
             raise ValidationException('File is none')
-        elif not '.' in file and len(file) > 50:
+        elif _is_base64_like(file):
             body = file
-        elif file.endswith(".mp3") and file.startswith("http"):
-            response = requests.get(file)
-            if response.status_code != 200:
-                raise ValidationException(f'File could not be downloaded from url: {file}')
-            body = b64encode(response.content).decode('utf-8')
-        elif file.endswith(".mp3"):
-            with open(file, "rb") as media:
-                body = b64encode(media.read()).decode('utf-8')                
+        elif _is_mp3(file) and file.startswith(_URL_PREFIXES):
+            body = self._download(file)
+        elif _is_mp3(file):
+            try:
+                media = open(file, "rb")
+            except FileNotFoundError:
+                raise ValidationException(f'File not found: {file}')
+
+            with media:
+                body = _b64encode_chunks(iter(lambda: media.read(B64_CHUNK_SIZE), b''))
         else:
             raise ValidationException('File extension is not .mp3 or it is not a base64 string.')
 
         if not lang or lang not in ("en", "ru", "de", "el", "pt", "fr"):
             raise ValidationException(f'Lang not in "en", "ru", "de", "el", "pt", "fr". You send {lang}')
 
-        result = self.solve(body=body, method=method, **kwargs)
+        result = self.solve(body=body, method=method, lang=lang, **kwargs)
         return result
 
     def text(self, text, **kwargs):
@@ -533,6 +788,8 @@ class TwoCaptcha():
             Image with instruction for worker to help him to solve captcha correctly.
         hintText : str, optional
             Text will be shown to worker to help him to to solve captcha correctly.
+        preread : bool, optional
+            Read several files into memory concurrently before they are uploaded. Default: False.
         softId : int, optional
             ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
             spendings of their software users.
@@ -543,17 +800,21 @@ class TwoCaptcha():
             {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
         '''
 
+        # a single file has nothing to read concurrently
+        preread = kwargs.pop('preread', False)
+
         if isinstance(files, str):
 
-            file = self.get_method(files)['file']
+            params = self.get_method(files)
+            params['method'] = 'rotatecaptcha'
 
-            result = self.solve(file=file, method='rotatecaptcha', **kwargs)
+            result = self.solve(**params, **kwargs)
             return result
 
         elif isinstance(files, dict):
             files = list(files.values())
 
-        files = self.extract_files(files)
+        files = self.extract_files(files, preread)
 
         result = self.solve(files=files, method='rotatecaptcha', **kwargs)
         return result
@@ -904,40 +1165,298 @@ class TwoCaptcha():
         result : string
         '''
 
-        id_ = self.send(**kwargs)
+        method = kwargs.get('method')
+
+        token_key = self._token_key(kwargs)
+        cached = self._cached_token(token_key)
+
+        if cached:
+            return cached
+
+        id_, code = self._submit(**kwargs)
         result = {'captchaId': id_}
 
         if self.callback is None:
             timeout = float(timeout or self.default_timeout)
             sleep = int(polling_interval or self.polling_interval)
+            captcha_type = _captcha_type(kwargs)
+            delay = min(self._initial_delay(captcha_type), sleep)
 
-            code = self.wait_result(id_, timeout, sleep)
+            # the answer may already come with the submission or be cached,
+            # then there's nothing to poll for (nor a solve time to learn)
+            if code is None and self.api_client.is_cached(**self._result_query(id_)):
+                code = self.get_result(id_)
 
-            if self.extendedResponse == True:
+            elif code is None:
+                started = time.monotonic()
+                code = self.wait_result(id_, timeout, sleep, delay)
+                self._learn_solve_time(captcha_type, time.monotonic() - started)
 
-                new_code = {
-                    key if key != 'request' else 'code': value
-                    for key, value in code.items()
-                    if key != 'status'
-                }
-                result.update(new_code)
-            else:
-                result.update({'code': code})
+            self.update_result(result, code)
+            self._store_token(token_key, method, result)
 
             return result
 
-    def wait_result(self, id_, timeout, polling_interval):
+    def _token_key(self, kwargs):
+
+        if self.callback is not None or kwargs.get('method') not in self.token_cache_ttl:
+            return None
+
+        return json.dumps(kwargs, sort_keys=True, default=str)
+
+    def _cached_token(self, key):
+        '''Copy of a result solved for identical params within the token cache
+        TTL of its method, None if there is no one.
+        '''
+
+        if key is None:
+            return None
+
+        with self._tokens_lock:
+            cached = self._tokens.get(key)
+
+            if cached and cached[0] > time.monotonic():
+                self._tokens.move_to_end(key)
+                return dict(cached[1])
+
+            self._tokens.pop(key, None)
+
+    def _store_token(self, key, method, result):
+
+        if key is None:
+            return
+
+        with self._tokens_lock:
+            self._tokens[key] = (time.monotonic() + self.token_cache_ttl[method], dict(result))
+            self._tokens.move_to_end(key)
+
+            while len(self._tokens) > TOKEN_CACHE_SIZE:
+                self._tokens.popitem(last=False)
+
+    def _forget_token(self, id_):
+
+        with self._tokens_lock:
+            for key, (_, result) in list(self._tokens.items()):
+                if result.get('captchaId') == id_:
+                    del self._tokens[key]
+
+    def _initial_delay(self, captcha_type):
+        '''Seconds to wait before the first poll of a captcha of this type,
+        see _captcha_type.
+        '''
+
+        learned = self._solve_times.get(captcha_type)
+
+        if learned is None:
+            return INITIAL_DELAYS.get(captcha_type, 0)
+
+        return learned * LEARNED_DELAY_FACTOR
+
+    def _learn_solve_time(self, captcha_type, seconds):
+        '''Adds a solve time to the moving average used by _initial_delay.'''
+
+        average = self._solve_times.get(captcha_type)
+
+        if average is not None:
+            seconds = average + SOLVE_TIME_WEIGHT * (seconds - average)
+
+        self._solve_times[captcha_type] = seconds
+
+    def update_result(self, result, code):
+        '''Puts the answer received from get_result into the result dict.'''
+
+        if self.extendedResponse == True:
+
+            new_code = {
+                key if key != 'request' else 'code': value
+                for key, value in code.items()
+                if key != 'status'
+            }
+            result.update(new_code)
+        else:
+            result.update({'code': code})
+
+        return result
+
+    def solve_many(self, method, jobs, max_concurrent=10, timeout=0, polling_interval=0):
+        '''Sends several captchas of one type at once, then polls all of them
+        together with batched res.php requests.
+
+        Parameters
+        __________
+        method : str
+            The name of the method must be found in the documentation https://2captcha.com/2captcha-api
+        jobs : list
+            Params of every captcha (dict), the same as for send().
+        max_concurrent : int
+            Number of captchas submitted simultaneously. Default: 10.
+        timeout : float
+            Polling timeout for all captchas. Default: defaultTimeout.
+        polling_interval : int
+            Maximum interval between polls. Default: pollingInterval.
+
+        Returns
+
+        results : dict
+            {job index: result}, result is the same dict solve() returns or the
+            exception raised for this job.
+        '''
+
+        results = {}
+        pending = {}
+
+        if not jobs:
+            return results
+
+        workers = min(max_concurrent, len(jobs))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(self.send, method=method, **job) for job in jobs]
+
+        for idx, future in enumerate(futures):
+            try:
+                pending[future.result()] = idx
+
+            except Exception as e:
+                results[idx] = e
+
+        if self.callback is not None:
+            results.update({idx: {'captchaId': id_} for id_, idx in pending.items()})
+            return results
+
+        answers = self.wait_results(list(pending), timeout, polling_interval)
+
+        for id_, code in answers.items():
+            idx = pending[id_]
+
+            if isinstance(code, Exception):
+                results[idx] = code
+            else:
+                results[idx] = self.update_result({'captchaId': id_}, code)
+
+        return results
+
+    def wait_results(self, ids, timeout=0, polling_interval=0):
+        '''Waits for several captchas sent earlier, polling all of them with one
+        res.php request per polling cycle.
+
+        Parameters
+        __________
+        ids : list
+            IDs of the captchas sent for solution.
+        timeout : float
+            Polling timeout for all captchas. Default: defaultTimeout.
+        polling_interval : int
+            Maximum interval between polls. Default: pollingInterval.
+
+        Returns
+
+        answers : dict
+            {id: answer or exception}, TimeoutException for captchas that
+            were not solved in time.
+        '''
+
+        timeout = float(timeout or self.default_timeout)
+        sleep = int(polling_interval or self.polling_interval)
+
+        pending = {str(id_) for id_ in ids}
+        answers = {}
+
+        deadline = time.monotonic() + timeout
+        interval = POLLING_START * sleep
+
+        time.sleep(_sleep_time(interval, deadline))
+
+        while pending and time.monotonic() < deadline:
+
+            for id_, code in self.poll_many(list(pending)).items():
+                pending.discard(id_)
+                answers[id_] = code
+
+            if pending:
+                interval = min(sleep, interval * POLLING_BACKOFF)
+                time.sleep(_sleep_time(interval + random.uniform(0, POLLING_JITTER * interval),
+                                       deadline))
+
+        for id_ in pending:
+            answers[id_] = TimeoutException(f'timeout {timeout} exceeded')
+
+        return answers
+
+    def poll_many(self, ids):
+        '''Polls several captchas, with a single request when possible.
+
+        Returns
+
+        answers : dict
+            {id: answer or exception} for captchas that are ready or failed,
+            captchas that can't be polled right now are left out.
+        '''
+
+        if len(ids) > 1 and self.extendedResponse != True:
+            try:
+                return self._batch_answers(self.api_client.res_batch(self.API_KEY, ids))
+
+            except _ApiNetworkException:
+                # transient, all of them are polled again in the next cycle
+                return {}
+
+            except _ApiException:
+                # a failed captcha may break the whole batch, poll one by one
+                pass
+
+        answers = {}
+
+        for id_ in ids:
+            try:
+                answers[id_] = self.get_result(id_)
+
+            except (NetworkException, _ApiNetworkException):
+                pass
+
+            except (ApiException, _ApiException) as e:
+                answers[id_] = e
+
+        return answers
+
+    def _batch_answers(self, answers):
+        '''{id: Answer} of a batch poll -> {id: answer or exception} of the
+        captchas that are ready or failed
+        '''
+
+        return {
+            id_: answer.payload if answer.status == 'OK'
+            else ApiException(answer.status)
+            for id_, answer in answers.items()
+            if answer.status != 'CAPCHA_NOT_READY'
+        }
+
+    def wait_result(self, id_, timeout, polling_interval, initial_delay=0):
+        '''Polls the answer with exponential backoff and jitter, see
+        POLLING_START. The first poll is deferred by initial_delay seconds if
+        that is longer.
+        '''
+
+        deadline = time.monotonic() + timeout
+        interval = POLLING_START * polling_interval
+
+        time.sleep(_sleep_time(max(initial_delay, interval), deadline))
 
-        max_wait = time.time() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
 
-        while time.time() < max_wait:
+            if remaining <= 0:
+                break
 
+            # a hung request can't outlast the overall timeout
             try:
-                return self.get_result(id_)
+                return self.get_result(id_, timeout=remaining)
 
-            except NetworkException:
+            # not ready yet or a transient res.php failure
+            except (NetworkException, _ApiNetworkException):
 
-                time.sleep(polling_interval)
+                interval = min(polling_interval, interval * POLLING_BACKOFF)
+                time.sleep(_sleep_time(interval + random.uniform(0, POLLING_JITTER * interval),
+                                       deadline))
 
         raise TimeoutException(f'timeout {timeout} exceeded')
 
@@ -946,20 +1465,98 @@ class TwoCaptcha():
         if not file:
             raise ValidationException('File required')
 
-        if not '.' in file and len(file) > 50:
+        if _is_base64_like(file):
             return {'method': 'base64', 'body': file}
 
-        if file.startswith('http'):
-            img_resp = requests.get(file)
-            if img_resp.status_code != 200:
-                raise ValidationException(f'File could not be downloaded from url: {file}')
-            return {'method': 'base64', 'body': b64encode(img_resp.content).decode('utf-8')}
+        # uploaded as is, base64 would make the request a third larger
+        if file.startswith(_URL_PREFIXES):
+            return {'method': 'post', 'file': self._download_upload(file)}
 
         if not os.path.exists(file):
             raise ValidationException(f'File not found: {file}')
 
         return {'method': 'post', 'file': file}
 
+    def _download(self, url):
+        '''Downloads media and returns it base64-encoded. Unless the download
+        cache is enabled, chunks are encoded as they arrive instead of
+        buffering the whole file first, see _fetch.
+        '''
+
+        if self.download_cache_ttl:
+            return _b64encode(self._fetch(url)).decode('ascii')
+
+        with self._get_media(url) as response:
+            return _b64encode_chunks(response.iter_content(B64_CHUNK_SIZE))
+
+    def _download_upload(self, url):
+        '''Downloads an image as a (filename, content) upload, see _fetch.'''
+
+        content = self._fetch(url)
+        return (_upload_filename(url, content), content)
+
+    def _get_media(self, url):
+        '''Streamed GET-request for media, closing the response releases its
+        connection.
+        '''
+
+        # media isn't text/plain or JSON like the API responses
+        response = self._http.get(url, timeout=10, stream=True,
+                                  headers={'Accept': '*/*'})
+
+        if response.status_code != 200:
+            response.close()
+            raise ValidationException(f'File could not be downloaded from url: {url}')
+
+        return response
+
+    def _fetch(self, url):
+        '''Downloads media, answering repeated requests for the same URL from
+        memory for download_cache_ttl seconds if it's set. The cache holds at
+        most DOWNLOAD_CACHE_SIZE bytes, least recently used files are dropped
+        first.
+        '''
+
+        now = time.monotonic()
+
+        if self.download_cache_ttl:
+            with self._downloads_lock:
+                cached = self._downloads.get(url)
+
+                if cached and cached[0] > now:
+                    self._downloads.move_to_end(url)
+                    return cached[1]
+
+        # read into one growing buffer instead of joining a list of chunks
+        with self._get_media(url) as response:
+            content = bytearray()
+            for chunk in response.iter_content(B64_CHUNK_SIZE):
+                content += chunk
+
+        if not self.download_cache_ttl or len(content) > DOWNLOAD_CACHE_SIZE:
+            return content
+
+        with self._downloads_lock:
+            self._forget_download(url)
+
+            for key in [k for k, (expiry, _) in self._downloads.items() if expiry <= now]:
+                self._forget_download(key)
+
+            while self._downloads_size + len(content) > DOWNLOAD_CACHE_SIZE:
+                self._forget_download(next(iter(self._downloads)))
+
+            self._downloads[url] = (now + self.download_cache_ttl, content)
+            self._downloads_size += len(content)
+
+        return content
+
+    def _forget_download(self, url):
+
+        cached = self._downloads.pop(url, None)
+
+        if cached:
+            self._downloads_size -= len(cached[1])
+
     def send(self, **kwargs):
         """This method can be used for manual captcha submission
 
@@ -973,38 +1570,77 @@ class TwoCaptcha():
 
         """
 
+        return self._submit(**kwargs)[0]
+
+    def _submit(self, **kwargs):
+        '''Sends captcha, returns its ID and the answer if the server included
+        it in the response (None otherwise).
+        '''
+
+        params, files = self._prepare_send(kwargs)
+        response = self.api_client.in_(files=files, **params)
+
+        return self._parse_send(response)
+
+    def _prepare_send(self, kwargs):
+
         params = self.default_params(kwargs)
         params = self.rename_params(params)
 
-        params, files = self.check_hint_img(params)
+        return self.check_hint_img(params)
 
-        response = self.api_client.in_(files=files, **params)
+    def _parse_send(self, response):
 
         if not response.startswith('OK|'):
             raise ApiException(f'cannot recognize response {response}')
 
-        return response[3:]
+        # 'OK|id' or, for captchas solved right away, 'OK|id|answer'
+        id_, _, answer = response[3:].partition('|')
 
-    def get_result(self, id_):
-        import json
+        if not answer:
+            return id_, None
+
+        if self.extendedResponse == True:
+            return id_, {'status': 1, 'request': answer}
+
+        return id_, answer
+
+    def get_result(self, id_, timeout=None):
         """This method can be used for manual captcha answer polling.
 
         Parameters
         __________
         id_ : str
             ID of the captcha sent for solution
+        timeout : float, optional
+            Timeout of the HTTP request in seconds.
         Returns
 
         answer : text
         """
 
+        response = self.api_client.res(timeout=timeout, **self._result_query(id_))
+        return self._parse_result(response)
+
+    def _result_query(self, id_):
+
+        query = {'key': self.API_KEY, 'action': 'get', 'id': id_}
+
         if self.extendedResponse == True:
+            query['json'] = 1
 
-            response = self.api_client.res(key=self.API_KEY, action='get', id=id_, json=1)
+        return query
+
+    def _parse_result(self, response):
+
+        if self.extendedResponse == True:
 
             response_data = json.loads(response)
 
             if response_data.get("status") == 0:
+                if response_data.get("request") != 'CAPCHA_NOT_READY':
+                    raise ApiException(response_data.get("request"))
+
                 raise NetworkException
 
             if not response_data.get("status") == 1:
@@ -1014,15 +1650,15 @@ class TwoCaptcha():
 
         else:
 
-            response = self.api_client.res(key=self.API_KEY, action='get', id=id_)
+            answer = parse_answer(response)
 
-            if response == 'CAPCHA_NOT_READY':
+            if answer.status == 'CAPCHA_NOT_READY':
                 raise NetworkException
 
-            if not response.startswith('OK|'):
+            if answer.status != 'OK' or answer.payload is None:
                 raise ApiException(f'cannot recognize response {response}')
 
-            return response[3:]
+            return answer.payload
 
     def balance(self):
         '''Get my balance
@@ -1051,6 +1687,9 @@ class TwoCaptcha():
 
         '''
 
+        if not correct:
+            self._forget_token(id_)
+
         rep = 'reportgood' if correct else 'reportbad'
         self.api_client.res(key=self.API_KEY, action=rep, id=id_)
 
@@ -1058,67 +1697,57 @@ class TwoCaptcha():
 
     def rename_params(self, params):
 
-        replace = {
-            'caseSensitive': 'regsense',
-            'minLen': 'min_len',
-            'maxLen': 'max_len',
-            'minLength': 'min_len',
-            'maxLength': 'max_len',
-            'hintText': 'textinstructions',
-            'hintImg': 'imginstructions',
-            'url': 'pageurl',
-            'score': 'min_score',
-            'text': 'textcaptcha',
-            'rows': 'recaptcharows',
-            'cols': 'recaptchacols',
-            'previousId': 'previousID',
-            'canSkip': 'can_no_answer',
-            'apiServer': 'api_server',
-            'softId': 'soft_id',
-            'callback': 'pingback',
-            'datas': 'data-s',
-        }
-
         new_params = {
-            v: params.pop(k)
-            for k, v in replace.items() if k in params
+            _RENAME_MAP.get(k, k): v
+            for k, v in params.items() if k != 'proxy'
         }
 
-        proxy = params.pop('proxy', '')
+        proxy = params.get('proxy')
         proxy and new_params.update({
             'proxy': proxy['uri'],
             'proxytype': proxy['type']
         })
 
-        new_params.update(params)
-
         return new_params
 
     def default_params(self, params):
 
-        params.update({'key': self.API_KEY})
+        params['key'] = self.API_KEY
 
         callback = params.pop('callback', self.callback)
         soft_id = params.pop('softId', self.soft_id)
 
-        if callback: params.update({'callback': callback})
-        if soft_id: params.update({'softId': soft_id})
+        if callback: params['callback'] = callback
+        if soft_id: params['softId'] = soft_id
 
         self.has_callback = bool(callback)
 
         return params
 
-    def extract_files(self, files):
+    def extract_files(self, files, preread=False):
 
         if len(files) > self.max_files:
             raise ValidationException(
                 f'Too many files (max: {self.max_files})')
 
-        not_exists = [f for f in files if not (os.path.exists(f))]
+        # stat calls overlap on network filesystems, a pool isn't worth
+        # starting for a couple of files
+        if len(files) >= PARALLEL_STAT_MIN_FILES:
+            with ThreadPoolExecutor(max_workers=min(8, len(files))) as pool:
+                exists = list(pool.map(os.path.exists, files))
+        else:
+            exists = [os.path.exists(f) for f in files]
+
+        not_exists = [f for f, ok in zip(files, exists) if not ok]
 
         if not_exists:
             raise ValidationException(f'File not found: {not_exists}')
 
+        # all files are read at once, the upload is then sent from memory
+        if preread and files:
+            with ThreadPoolExecutor(max_workers=len(files)) as pool:
+                files = list(pool.map(_read_upload, files))
+
         files = {f'file_{e+1}': f for e, f in enumerate(files)}
         return files
 
@@ -1130,17 +1759,22 @@ class TwoCaptcha():
         if not hint:
             return params, files
 
-        if not '.' in hint and len(hint) > 50:
-            params.update({'imginstructions': hint})
+        if _is_base64_like(hint):
+            params['imginstructions'] = hint
+            return params, files
+
+        if hint.startswith(_URL_PREFIXES):
+            params['imginstructions'] = self._download(hint)
             return params, files
 
         if not os.path.exists(hint):
             raise ValidationException(f'File not found: {hint}')
 
-        if not files:
-            files = {'file': params.pop('file', {})}
+        # the captcha itself may be a base64 body, then there's no file to add
+        if not files and 'file' in params:
+            files = {'file': params.pop('file')}
 
-        files.update({'imginstructions': hint})
+        files['imginstructions'] = hint
 
         return params, files
 